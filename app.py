@@ -1,7 +1,9 @@
 import os
+import secrets
 from pathlib import Path
 import altair as alt
-from eindag.charts_interactive import ChartSpec as IChartSpec, line_chart, pie_chart_counts, bar_chart_sum_by_category
+from eindag.charts_interactive import ChartSpec as IChartSpec, line_chart, pie_chart_counts, bar_chart_sum_by_category, small_multiples
+from eindag.anomaly import score_anomalies, anomaly_points
 
 import streamlit as st
 import pandas as pd
@@ -35,19 +37,33 @@ from eindag import (
     compute_basic_metrics,
     write_json,
     write_csv,
-    ChartSpec,
-    FishLineChart,
-    FishPieChart,
-    FishBarChart,
+    export_rows,
+    prune_exports,
+    tank_keys,
+    EXPORT_STATIC_DIR,
+    EXPORT_MAX_AGE_SECONDS,
+    STATIC_MAX_BYTES,
 )
 
 
 REPO_ROOT = str(Path(__file__).resolve().parent)
 
 
+@st.cache_data(max_entries=16, show_spinner="Scoring anomalies...")
+def anomaly_flags(saved_path: str, column: str, _df: pd.DataFrame) -> pd.DataFrame:
+    """Anomaly flags for one column, cached per upload so reruns don't rescore.
+
+    ``saved_path`` is unique per upload and stands in for the frame, which
+    Streamlit would otherwise hash on every rerun.
+    """
+    scored = score_anomalies(_df, columns=[column])
+    return scored[[f"{column}_anomaly"]]
+
+
 def init_state():
     st.session_state.setdefault("auth", {"logged_in": False, "user": None})
     st.session_state.setdefault("last_upload", None)
+    st.session_state.setdefault("last_export", None)
 
 
 def render_header():
@@ -78,6 +94,8 @@ def logout_button():
     if st.button("Log out"):
         st.session_state["auth"] = {"logged_in": False, "user": None}
         st.session_state["last_upload"] = None
+        remove_export()
+        st.session_state["last_export"] = None
         st.rerun()
 
 
@@ -110,10 +128,18 @@ def home_view():
     st.write(f"Rows: **{ds.n_rows}** | Columns: **{len(ds.columns)}**")
     st.dataframe(pd.DataFrame(ds.preview_rows), use_container_width=True)
 
+    if ds.quality_issues:
+        with st.expander(f"Data quality: {len(ds.quality_issues)} issue(s) found"):
+            for msg in ds.errors:
+                st.write(f"- {msg}")
+
     st.markdown("---")
     st.markdown("### Create a chart")
 
-    chart_type = st.selectbox("Chart type", ["Fish Line", "Fish Pie (category counts)", "Fish Bar (sum by category)"])
+    chart_type = st.selectbox(
+        "Chart type",
+        ["Fish Line", "Fish Pie (category counts)", "Fish Bar (sum by category)", "Tank small multiples"],
+    )
 
     if chart_type == "Fish Line":
         x_col = st.selectbox("X column", ds.columns, index=0)
@@ -125,7 +151,13 @@ def home_view():
             y_col=y_col,
         )
 
-        chart = line_chart(df, spec)
+        anomalies = None
+        if y_col in ds.numeric_columns and st.checkbox("Flag anomalies (per-tank EWMA / rolling z-score)"):
+            scored = anomaly_flags(ds.saved_path, y_col, df)
+            anomalies = anomaly_points(df, scored, y_col)
+            st.caption(f"{len(anomalies)} reading(s) flagged for {pretty(y_col)}.")
+
+        chart = line_chart(df, spec, anomalies=anomalies)
 
         chart = chart.encode(
             x=alt.X(x_col, title=pretty(x_col)),
@@ -157,6 +189,20 @@ def home_view():
 
         st.altair_chart(chart, use_container_width=True)
 
+    elif chart_type == "Tank small multiples":
+        default_facets = [c for c in ("tank_id",) if c in ds.columns] or ds.columns[:1]
+        facet_cols = st.multiselect("Facet by", ds.columns, default=default_facets, format_func=pretty)
+        default_metrics = [c for c in ("dissolved_oxygen_mg_l", "temperature_c") if c in ds.numeric_columns] or ds.numeric_columns[:1]
+        metrics = st.multiselect("Metrics", ds.numeric_columns, default=default_metrics, format_func=pretty)
+        time_col = "timestamp" if "timestamp" in ds.columns else None
+        spec = IChartSpec(
+            title=f"{', '.join(pretty(m) for m in metrics)} by {' / '.join(pretty(c) for c in facet_cols)}",
+            x_col=time_col,
+        )
+
+        chart = small_multiples(df, spec, metrics=metrics, facet_cols=facet_cols)
+        st.altair_chart(chart)
+
     else:
         cat_col = st.selectbox("Category column", ds.columns, index=0)
         y_options = ds.numeric_columns if ds.numeric_columns else ds.columns
@@ -201,6 +247,90 @@ def home_view():
     with open(csv_abs, "rb") as f:
         st.download_button("Download CSV summary", f, file_name="eindag_numeric_summary.csv", use_container_width=True)
 
+    export_view(df, ds)
+
+
+def export_view(df, ds):
+    st.markdown("---")
+    st.markdown("### Export raw rows")
+    st.caption("Pick tanks, a time window and columns. Rows are streamed from the saved upload into a compressed file.")
+
+    tanks = None
+    if "tank_id" in ds.columns:
+        # Same normalization as the export's filter, whatever dtype tank_id was
+        # read as; applied to the distinct ids only, as this runs on every rerun.
+        all_tanks = sorted(tank_keys(pd.Series(df["tank_id"].dropna().unique())).unique())
+        picked = st.multiselect("Tanks (empty = all)", all_tanks)
+        tanks = picked or None
+
+    start = end = None
+    if "timestamp" in ds.columns:
+        ts = pd.to_datetime(df["timestamp"], errors="coerce", utc=True)
+        if ts.notna().any():
+            full = (ts.min().date(), ts.max().date())
+            window = st.date_input("Time window", full)
+            # Only filter on time if the window was narrowed: a time filter also
+            # drops rows with a missing or unparseable timestamp.
+            if isinstance(window, (list, tuple)) and len(window) == 2 and tuple(window) != full:
+                start = pd.Timestamp(window[0])
+                end = pd.Timestamp(window[1]) + pd.Timedelta(days=1) - pd.Timedelta(microseconds=1)
+                n_bad = int(ts.isna().sum())
+                if n_bad:
+                    st.caption(f"{n_bad:,} row(s) without a valid timestamp are left out of a narrowed window.")
+
+    columns = st.multiselect("Columns", ds.columns, default=ds.columns)
+    fmt = st.radio("Format", ["csv.gz", "parquet"], horizontal=True)
+
+    if st.button("Prepare export", use_container_width=True):
+        # Files under static/ are public; don't keep any for long.
+        prune_exports(REPO_ROOT, EXPORT_STATIC_DIR, EXPORT_MAX_AGE_SECONDS)
+        try:
+            # Unguessable name: everything under static/ is served without login.
+            rel, n_rows = export_rows(
+                REPO_ROOT,
+                ds.saved_path,
+                f"eindag_export_{secrets.token_hex(8)}",
+                fmt=fmt,
+                columns=columns or None,
+                tanks=tanks,
+                start=start,
+                end=end,
+                out_dir=EXPORT_STATIC_DIR,
+            )
+        except (ImportError, ValueError, TypeError, OSError) as e:
+            st.error(f"Export failed: {e}")
+        else:
+            remove_export()
+            st.session_state["last_export"] = {"path": rel, "rows": n_rows, "fmt": fmt}
+
+    export = st.session_state.get("last_export")
+    if export:
+        abs_path = os.path.join(REPO_ROOT, export["path"])
+        if not os.path.exists(abs_path):
+            st.info("The last export has expired; prepare it again.")
+            return
+        st.write(f"Exported **{export['rows']:,}** rows to `{export['path']}`")
+        size = os.path.getsize(abs_path)
+        if size > STATIC_MAX_BYTES:
+            st.warning(
+                f"The file is {size / 2**20:,.0f} MB, over the {STATIC_MAX_BYTES // 2**20} MB Streamlit can serve. "
+                "Pick fewer tanks, columns or a shorter window, or copy it from the path above."
+            )
+            return
+        # Streamlit serves static/ itself, so the file is never loaded into the app.
+        url = "app/" + Path(export["path"]).as_posix()
+        st.markdown(f'<a href="{url}" download="{os.path.basename(export["path"])}">Download export</a>', unsafe_allow_html=True)
+
+
+def remove_export():
+    """Delete this session's previous export file, if any."""
+    export = st.session_state.get("last_export")
+    if export:
+        try:
+            os.remove(os.path.join(REPO_ROOT, export["path"]))
+        except OSError:
+            pass
+
 
 def main():
     st.set_page_config(page_title=APP_NAME, page_icon="🐟", layout="wide")
@@ -1,37 +1,103 @@
 """The EinDag - aquaculture CSV-to-insights MVP.
 
 This is the project's custom library.
+
+Submodules are loaded lazily on first attribute access, so `import eindag`
+does not pull in pandas or matplotlib until something actually needs them.
 """
 
-from .constants import APP_NAME, TAGLINE, DEFAULT_FISH_PER_ICON, DEMO_USERS, UPLOAD_DIR, OUTPUT_DIR
-from .models import User, CSVDataSet
-from .auth import AuthManager, AuthResult
-from .io_utils import ensure_dirs, save_upload, read_csv_any, write_json, write_csv
-from .analytics import describe_dataset, compute_basic_metrics, bucketize_counts
-from .charts import ChartFactory, ChartSpec, FishPieChart, FishLineChart, FishBarChart
-
-__all__ = [
-    "APP_NAME",
-    "TAGLINE",
-    "DEFAULT_FISH_PER_ICON",
-    "DEMO_USERS",
-    "UPLOAD_DIR",
-    "OUTPUT_DIR",
-    "User",
-    "CSVDataSet",
-    "AuthManager",
-    "AuthResult",
-    "ensure_dirs",
-    "save_upload",
-    "read_csv_any",
-    "write_json",
-    "write_csv",
-    "describe_dataset",
-    "compute_basic_metrics",
-    "bucketize_counts",
-    "ChartFactory",
-    "ChartSpec",
-    "FishPieChart",
-    "FishLineChart",
-    "FishBarChart",
-]
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
+# Public name -> submodule that defines it.
+_EXPORTS = {
+    "APP_NAME": "constants",
+    "TAGLINE": "constants",
+    "DEFAULT_FISH_PER_ICON": "constants",
+    "DEMO_USERS": "constants",
+    "UPLOAD_DIR": "constants",
+    "OUTPUT_DIR": "constants",
+    "EXPORT_STATIC_DIR": "constants",
+    "EXPORT_MAX_AGE_SECONDS": "constants",
+    "STATIC_MAX_BYTES": "constants",
+    "User": "models",
+    "CSVDataSet": "models",
+    "QualityIssue": "models",
+    "AuthManager": "auth",
+    "AuthResult": "auth",
+    "ensure_dirs": "io_utils",
+    "save_upload": "io_utils",
+    "read_csv_any": "io_utils",
+    "write_json": "io_utils",
+    "write_csv": "io_utils",
+    "append_csv": "io_utils",
+    "tank_keys": "io_utils",
+    "iter_filtered_chunks": "io_utils",
+    "export_rows": "io_utils",
+    "prune_exports": "io_utils",
+    "validate_readings": "validation",
+    "parse_times_ns": "validation",
+    "describe_dataset": "analytics",
+    "compute_basic_metrics": "analytics",
+    "bucketize_counts": "analytics",
+    "bucket_codes": "analytics",
+    "value_distribution": "analytics",
+    "sum_by_bucket": "analytics",
+    "downsample_by_facet": "analytics",
+    "score_anomalies": "anomaly",
+    "anomaly_points": "anomaly",
+    "StreamingAnomalyDetector": "anomaly",
+    "IngestServer": "ingest",
+    "IngestConfig": "ingest",
+    "push_batch": "ingest",
+    "ChartFactory": "charts",
+    "ChartSpec": "charts",
+    "FishPieChart": "charts",
+    "FishLineChart": "charts",
+    "FishBarChart": "charts",
+}
+
+_SUBMODULES = {
+    "constants",
+    "models",
+    "auth",
+    "io_utils",
+    "validation",
+    "analytics",
+    "anomaly",
+    "ingest",
+    "charts",
+    "charts_interactive",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    elif name in _SUBMODULES:
+        value = importlib.import_module(f".{name}", __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    # Cache so later lookups skip __getattr__ entirely.
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__) | _SUBMODULES)
+
+
+if TYPE_CHECKING:
+    from .constants import APP_NAME, TAGLINE, DEFAULT_FISH_PER_ICON, DEMO_USERS, UPLOAD_DIR, OUTPUT_DIR, EXPORT_STATIC_DIR, EXPORT_MAX_AGE_SECONDS, STATIC_MAX_BYTES
+    from .models import User, CSVDataSet, QualityIssue
+    from .auth import AuthManager, AuthResult
+    from .io_utils import ensure_dirs, save_upload, read_csv_any, write_json, write_csv, append_csv, tank_keys, iter_filtered_chunks, export_rows, prune_exports
+    from .validation import parse_times_ns, validate_readings
+    from .analytics import describe_dataset, compute_basic_metrics, bucketize_counts, bucket_codes, value_distribution, sum_by_bucket, downsample_by_facet
+    from .anomaly import score_anomalies, anomaly_points, StreamingAnomalyDetector
+    from .ingest import IngestServer, IngestConfig, push_batch
+    from .charts import ChartFactory, ChartSpec, FishPieChart, FishLineChart, FishBarChart
@@ -5,15 +5,17 @@ This is intentionally simple so it can be built on later.
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 
+from .constants import SMALL_MULTIPLES_POINT_BUDGET
 from .models import CSVDataSet
+from .validation import NAT, parse_times_ns, validate_readings
 
 
-def describe_dataset(df: pd.DataFrame, filename: str, saved_path: str, preview_n: int = 10) -> CSVDataSet:
+def describe_dataset(df: pd.DataFrame, filename: str, saved_path: str, preview_n: int = 10, validate: bool = True) -> CSVDataSet:
     columns = [str(c) for c in df.columns]
     n_rows = int(len(df))
 
@@ -24,7 +26,12 @@ def describe_dataset(df: pd.DataFrame, filename: str, saved_path: str, preview_n
         if pd.api.types.is_numeric_dtype(df[c]):
             numeric_cols.append(str(c))
 
-    preview = df.head(preview_n).fillna("").to_dict(orient="records")
+    head = df.head(preview_n)
+    # Via object dtype so categorical and datetime columns can hold "".
+    preview = head.astype(object).where(head.notna(), "").to_dict(orient="records")
+
+    # Data quality checks: one summary line per problem, not per row.
+    issues = validate_readings(df) if validate else []
 
     return CSVDataSet(
         filename=filename,
@@ -33,7 +40,8 @@ def describe_dataset(df: pd.DataFrame, filename: str, saved_path: str, preview_n
         n_rows=n_rows,
         preview_rows=preview,
         numeric_columns=numeric_cols,
-        errors=[],
+        errors=[i.message() for i in issues],
+        quality_issues=issues,
     )
 
 
@@ -59,11 +67,203 @@ def compute_basic_metrics(df: pd.DataFrame) -> Dict[str, Any]:
     return summary
 
 
+# A line needs two points, so each facet gets at least this many per metric.
+MIN_FACET_POINTS = 2
+
+MISSING_LABEL = "(missing)"
+NON_FINITE_LABEL = "(±inf)"
+OTHER_LABEL = "Other"
+
+
+def bucket_codes(series: pd.Series, max_buckets: int = 8, numeric_method: str = "histogram") -> Tuple[np.ndarray, List[str]]:
+    """Assign every value to one of at most ``max_buckets`` buckets.
+
+    Returns ``(codes, labels)`` where ``codes[i]`` indexes into ``labels``.
+    Numeric columns with more distinct values than buckets are binned
+    ("histogram" = equal-width, "quantile" = equal-count); everything else
+    keeps its top categories and folds the rest into "Other". Missing values
+    (and, in binned columns, +/-inf) get their own bucket, counted within
+    ``max_buckets``. Only the final labels are turned into strings.
+    """
+    codes, labels, _ = _bucketize(series, max_buckets, numeric_method)
+    return codes, labels
+
+
+def _bucketize(series: pd.Series, max_buckets: int, numeric_method: str) -> Tuple[np.ndarray, List[str], bool]:
+    """``bucket_codes`` plus a flag saying whether the buckets are numeric bins."""
+    max_buckets = max(1, int(max_buckets))
+    is_numeric = pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+    if is_numeric:
+        values = pd.to_numeric(series, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+        finite = np.isfinite(values)
+        present = values[finite]
+        n_special = 0 if finite.all() else int(np.isnan(values).any()) + int(np.isinf(values).any())
+        n_bins = max(1, max_buckets - n_special)
+        # A prefix with too many distinct values settles it without hashing the whole column.
+        if len(pd.unique(present[:10_000])) > n_bins or len(pd.unique(present)) > n_bins:
+            return (*_numeric_bins(values, finite, n_bins, numeric_method), True)
+
+    # Factorizing works on the existing values/categorical codes, so no
+    # per-row strings are created.
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    return (*_top_k(codes, uniques, max_buckets), False)
+
+
+def _label(value: Any) -> str:
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _numeric_bins(values: np.ndarray, finite: np.ndarray, n_bins: int, method: str) -> Tuple[np.ndarray, List[str]]:
+    if method == "quantile":
+        edges = np.unique(np.quantile(values[finite], np.linspace(0.0, 1.0, n_bins + 1)))
+    elif method == "histogram":
+        edges = np.histogram_bin_edges(values[finite], bins=n_bins)
+    else:
+        raise ValueError(f"Unknown numeric_method: {method!r}")
+
+    n = len(edges) - 1
+    codes = np.searchsorted(edges, values, side="right") - 1
+    # The top edge belongs to the last bin (closed on the right).
+    codes = np.clip(codes, 0, n - 1)
+    labels = [f"[{edges[i]:.4g}, {edges[i + 1]:.4g})" for i in range(n)]
+    labels[-1] = labels[-1][:-1] + "]"
+
+    if not finite.all():
+        # NaN and +/-inf are different problems in the data, so keep them apart.
+        for mask, label in ((np.isnan(values), MISSING_LABEL), (np.isinf(values), NON_FINITE_LABEL)):
+            if mask.any():
+                codes = np.where(mask, len(labels), codes)
+                labels.append(label)
+    return codes.astype(np.int64), labels
+
+
+def _top_k(codes: np.ndarray, uniques: Any, k: int) -> Tuple[np.ndarray, List[str]]:
+    if len(uniques) == 0:
+        return np.zeros(len(codes), dtype=np.int64), [MISSING_LABEL] if len(codes) else []
+    missing = bool((codes < 0).any())
+    # The missing bucket counts towards k as well.
+    k = max(1, k - int(missing))
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    if len(uniques) <= k:
+        keep = np.arange(len(uniques))
+        labels = [_label(u) for u in uniques]
+    else:
+        # Leave room for the "Other" bucket so the total stays at k.
+        keep = np.argsort(-counts, kind="stable")[: max(1, k - 1)]
+        labels = [_label(uniques[i]) for i in keep] + [OTHER_LABEL]
+
+    remap = np.full(len(uniques), len(labels) - 1, dtype=np.int64)
+    remap[keep] = np.arange(len(keep))
+    out = np.where(codes >= 0, remap[np.maximum(codes, 0)], len(labels))
+    if missing:
+        labels.append(MISSING_LABEL)
+    return out, labels
+
+
+def value_distribution(series: pd.Series, max_buckets: int = 8, numeric_method: str = "histogram") -> List[Dict[str, Any]]:
+    """Counts per bucket (see ``bucket_codes``) for a pie/bar chart.
+
+    Numeric bins come back in bin order; categories come back largest first.
+    """
+    codes, labels, binned = _bucketize(series, max_buckets, numeric_method)
+    counts = np.bincount(codes, minlength=len(labels))
+    order = range(len(labels))
+    if not binned:
+        order = np.argsort(-counts, kind="stable")
+    return [{"category": labels[i], "count": int(counts[i])} for i in order if counts[i] > 0]
+
+
+def sum_by_bucket(categories: pd.Series, values: pd.Series, max_buckets: int = 12) -> List[Dict[str, Any]]:
+    """Sum ``values`` within each bucket of ``categories``, largest first."""
+    codes, labels = bucket_codes(categories, max_buckets)
+    y = pd.to_numeric(values, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    present = ~np.isnan(y)
+    sums = np.bincount(codes[present], weights=y[present], minlength=len(labels))
+    seen = np.bincount(codes, minlength=len(labels))
+    order = np.argsort(-sums, kind="stable")
+    return [{"category": labels[i], "sum": float(sums[i])} for i in order if seen[i] > 0]
+
+
+def downsample_by_facet(
+    df: pd.DataFrame,
+    facet_cols: List[str],
+    time_col: Optional[str],
+    metrics: List[str],
+    point_budget: int = SMALL_MULTIPLES_POINT_BUDGET,
+) -> pd.DataFrame:
+    """Per-facet time series, averaged into buckets so the total stays bounded.
+
+    Every facet (unique combination of ``facet_cols``) gets the same number
+    of time buckets, ``point_budget // (n_facets * len(metrics))``, spread
+    over that facet's own time span. All series come out of a single
+    groupby, and the result never has more than ``point_budget`` rows: if
+    there are too many facets for ``MIN_FACET_POINTS`` each, only the ones
+    with the most rows are kept. ``attrs["facets_total"]`` and
+    ``attrs["facets_shown"]`` say how many. Returns long-format rows:
+    ``facet``, ``time``, ``metric``, ``value``.
+    """
+    cols = ["facet", "time", "metric", "value"]
+    facet_cols = [c for c in facet_cols if c in df.columns]
+    metrics = [m for m in metrics if m in df.columns]
+    if df.empty or not facet_cols or not metrics:
+        return pd.DataFrame(columns=cols)
+
+    grouper = df.groupby(facet_cols, sort=True, observed=True, dropna=False)
+    codes = grouper.ngroup().to_numpy()
+    sizes = grouper.size()
+    n_facets = len(sizes)
+    max_facets = int(point_budget) // (MIN_FACET_POINTS * len(metrics))
+    keep = np.arange(n_facets)
+    if n_facets > max_facets:
+        keep = np.sort(np.argsort(-sizes.to_numpy(), kind="stable")[:max_facets])
+        remap = np.full(n_facets, -1, dtype=np.int64)
+        remap[keep] = np.arange(len(keep))
+        codes = remap[codes]
+    if len(keep) == 0:
+        empty = pd.DataFrame(columns=cols)
+        empty.attrs.update(facets_total=n_facets, facets_shown=0)
+        return empty
+    per_facet = int(point_budget) // (len(keep) * len(metrics))
+
+    if time_col and time_col in df.columns:
+        # Same parsing as ingest validation: any format pandas infers, zones to UTC.
+        raw = parse_times_ns(df[time_col])
+        t = raw.astype("float64")
+        t[raw == NAT] = np.nan
+        has_time = True
+    else:
+        has_time = False
+        t = np.arange(len(df), dtype="float64")
+    # Rows of dropped facets get no time, so the groupby below skips them.
+    t[codes < 0] = np.nan
+
+    # Bucket index within each facet's own [min, max] time span.
+    t_series = pd.Series(t)
+    t_min = t_series.groupby(codes).transform("min").to_numpy()
+    t_max = t_series.groupby(codes).transform("max").to_numpy()
+    span = np.where(t_max > t_min, t_max - t_min, 1.0)
+    bucket = np.minimum(np.floor((t - t_min) / span * per_facet), per_facet - 1)
+
+    # One integer key per (facet, bucket) keeps this to a single cheap groupby;
+    # rows without a usable time get NaN and are dropped by the groupby.
+    key = codes * per_facet + bucket
+    values = df[metrics].apply(pd.to_numeric, errors="coerce").reset_index(drop=True)
+    values["time"] = t
+    agg = values.groupby(key, sort=True).mean().reset_index(names="key")
+    agg["code"] = (agg["key"] // per_facet).astype(np.int64)
+
+    labels = sizes.index.to_frame(index=False).astype(str).agg(" · ".join, axis=1).to_numpy()[keep]
+    agg["facet"] = labels[agg["code"].to_numpy()]
+    if has_time:
+        agg["time"] = pd.to_datetime(agg["time"].round().astype("int64"))
+
+    out = agg.melt(id_vars=["facet", "time"], value_vars=metrics, var_name="metric", value_name="value")[cols]
+    out.attrs.update(facets_total=n_facets, facets_shown=len(keep))
+    return out
+
+
 def bucketize_counts(series: pd.Series, max_buckets: int = 8) -> List[Dict[str, Any]]:
     """Turn a column into top-k category counts for a pie/bar chart."""
-    s = series.astype(str).fillna("")
-    counts = s.value_counts().head(max_buckets)
-    rows: List[Dict[str, Any]] = []
-    for k, v in counts.items():
-        rows.append({"category": str(k), "count": int(v)})
-    return rows
+    return value_distribution(series, max_buckets=max_buckets)
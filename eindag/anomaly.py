@@ -0,0 +1,227 @@
+"""Per-tank statistical anomaly scoring.
+
+Fixed thresholds miss slow drifts, so every numeric sensor column is scored
+against its own tank's recent history in two ways:
+- EWMA z-score: distance from the exponentially weighted mean/std
+- rolling z-score: distance from the mean/std of the last ``window`` readings
+
+Each reading is compared to the baseline built from the readings *before* it.
+``score_anomalies`` does this for a whole DataFrame in one grouped pass;
+``StreamingAnomalyDetector`` keeps per-tank state so pushed readings can be
+scored one at a time in O(1).
+"""
+
+from __future__ import annotations
+
+import math
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_ALPHA = 0.1
+DEFAULT_WINDOW = 60
+DEFAULT_MIN_PERIODS = 10
+DEFAULT_Z_THRESHOLD = 3.0
+
+
+def sensor_columns(df: pd.DataFrame, group_col: str = "tank_id") -> List[str]:
+    """Numeric columns worth scoring (everything numeric except the group key)."""
+    return [str(c) for c in df.columns if str(c) != group_col and pd.api.types.is_numeric_dtype(df[c])]
+
+
+def score_anomalies(
+    df: pd.DataFrame,
+    columns: Optional[List[str]] = None,
+    group_col: str = "tank_id",
+    time_col: str = "timestamp",
+    alpha: float = DEFAULT_ALPHA,
+    window: int = DEFAULT_WINDOW,
+    min_periods: int = DEFAULT_MIN_PERIODS,
+    z_threshold: float = DEFAULT_Z_THRESHOLD,
+) -> pd.DataFrame:
+    """Score every column per group; returns a frame aligned to ``df``'s rows.
+
+    For each column ``c`` the result has ``c_ewma``, ``c_ewma_z``,
+    ``c_rolling_z`` and a boolean ``c_anomaly``. Rows are ordered by
+    ``time_col`` within each group when that column exists; without
+    ``group_col`` the whole frame is treated as one tank.
+    """
+    if columns is None:
+        columns = sensor_columns(df, group_col)
+    out = pd.DataFrame(index=df.index)
+    if not columns or df.empty:
+        return out
+
+    n = len(df)
+    # Integer group codes keep the grouped index cheap to build, and sorting
+    # by (tank, time) makes every group a contiguous block.
+    if group_col in df.columns:
+        codes, _ = pd.factorize(df[group_col])
+    else:
+        codes = np.zeros(n, dtype=np.int64)
+    if time_col in df.columns:
+        t = df[time_col]
+        if not pd.api.types.is_datetime64_any_dtype(t):
+            t = pd.to_datetime(t, errors="coerce")
+        order = np.lexsort((t.to_numpy(), codes))
+    else:
+        order = np.argsort(codes, kind="stable")
+
+    keys = pd.Series(codes[order])
+    values = df[columns].apply(pd.to_numeric, errors="coerce").astype("float64").iloc[order].reset_index(drop=True)
+    grouped = values.groupby(keys, sort=False)
+
+    def ungroup(frame: pd.DataFrame) -> pd.DataFrame:
+        # groupby().ewm/rolling prepend the group key to the index; drop it
+        # and restore the sorted row order so everything lines up with `values`.
+        return frame.droplevel(0).sort_index()
+
+    ewm = grouped.ewm(alpha=alpha, adjust=False, ignore_na=True)
+    ewm_mean = ungroup(ewm.mean())
+    ewm_std = np.sqrt(ungroup(ewm.var(bias=True)))
+    roll = grouped.rolling(window, min_periods=min(max(min_periods, 2), window))
+    roll_mean = ungroup(roll.mean())
+    roll_std = ungroup(roll.std())
+
+    # Baselines come from the previous reading in the same tank.
+    baselines = pd.concat([ewm_mean, ewm_std, roll_mean, roll_std], axis=1, keys=["em", "es", "rm", "rs"])
+    prev = baselines.groupby(keys, sort=False).shift(1)
+    seen_before = values.notna().groupby(keys, sort=False).cumsum() - values.notna()
+
+    inverse = np.empty(n, dtype=np.int64)
+    inverse[order] = np.arange(n)
+
+    for c in columns:
+        x = values[c]
+        es = prev[("es", c)].where((prev[("es", c)] > 0) & (seen_before[c] >= min_periods))
+        rs = prev[("rs", c)].where(prev[("rs", c)] > 0)
+        ez = (x - prev[("em", c)]) / es
+        rz = (x - prev[("rm", c)]) / rs
+        flagged = (ez.abs() > z_threshold) | (rz.abs() > z_threshold)
+
+        out[f"{c}_ewma"] = ewm_mean[c].to_numpy()[inverse]
+        out[f"{c}_ewma_z"] = ez.to_numpy()[inverse]
+        out[f"{c}_rolling_z"] = rz.to_numpy()[inverse]
+        out[f"{c}_anomaly"] = flagged.to_numpy()[inverse]
+
+    return out
+
+
+def anomaly_points(df: pd.DataFrame, scored: pd.DataFrame, column: str) -> pd.DataFrame:
+    """Rows of ``df`` flagged for ``column`` (ready to overlay on a line chart)."""
+    flag = f"{column}_anomaly"
+    if flag not in scored.columns:
+        return df.iloc[0:0]
+    return df.loc[scored[flag].to_numpy()]
+
+
+@dataclass
+class _ColumnState:
+    window: int
+    n: int = 0
+    ewma: float = math.nan
+    ewvar: float = 0.0
+    recent: Deque[float] = field(default_factory=deque)
+    rsum: float = 0.0
+    rsumsq: float = 0.0
+
+
+class StreamingAnomalyDetector:
+    """Keeps per-tank, per-column state and scores each new reading in O(1).
+
+    Matches ``score_anomalies`` for readings that arrive in time order; missing
+    values are skipped rather than counted in the rolling window.
+    """
+
+    def __init__(
+        self,
+        columns: List[str],
+        alpha: float = DEFAULT_ALPHA,
+        window: int = DEFAULT_WINDOW,
+        min_periods: int = DEFAULT_MIN_PERIODS,
+        z_threshold: float = DEFAULT_Z_THRESHOLD,
+    ) -> None:
+        self.columns = list(columns)
+        self.alpha = alpha
+        self.window = window
+        self.min_periods = min_periods
+        self.z_threshold = z_threshold
+        self._state: Dict[Any, Dict[str, _ColumnState]] = {}
+
+    def update(self, tank_id: Any, reading: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Score one reading against the tank's history, then fold it in."""
+        tank = self._state.get(tank_id)
+        if tank is None:
+            tank = {c: _ColumnState(window=self.window) for c in self.columns}
+            self._state[tank_id] = tank
+
+        result: Dict[str, Dict[str, Any]] = {}
+        for c in self.columns:
+            try:
+                x = float(reading.get(c))
+            except (TypeError, ValueError):
+                continue
+            if math.isnan(x):
+                continue
+            st = tank[c]
+            ez = self._ewma_z(st, x)
+            rstd = self._rolling_std(st)
+            rz = (x - st.rsum / len(st.recent)) / rstd if rstd else None
+            result[c] = {
+                "ewma_z": ez,
+                "rolling_z": rz,
+                "anomaly": any(z is not None and abs(z) > self.z_threshold for z in (ez, rz)),
+            }
+            self._push(st, x)
+        return result
+
+    def score_frame(self, df: pd.DataFrame, group_col: str = "tank_id") -> pd.DataFrame:
+        """Feed a batch through ``update`` in row order; returns per-row flags."""
+        out = pd.DataFrame(index=df.index)
+        cols = [c for c in self.columns if c in df.columns]
+        if not cols or df.empty:
+            return out
+        keys = df[group_col].to_numpy() if group_col in df.columns else np.zeros(len(df), dtype=np.int8)
+        arr = df[cols].apply(pd.to_numeric, errors="coerce").to_numpy(dtype="float64")
+        flags = np.zeros((len(df), len(cols)), dtype=bool)
+        for i, (key, row) in enumerate(zip(keys, arr)):
+            scored = self.update(key, dict(zip(cols, row)))
+            for j, c in enumerate(cols):
+                flags[i, j] = c in scored and scored[c]["anomaly"]
+        for j, c in enumerate(cols):
+            out[f"{c}_anomaly"] = flags[:, j]
+        return out
+
+    def _ewma_z(self, st: _ColumnState, x: float) -> Optional[float]:
+        if st.n < self.min_periods or st.ewvar <= 0:
+            return None
+        return (x - st.ewma) / math.sqrt(st.ewvar)
+
+    def _rolling_std(self, st: _ColumnState) -> Optional[float]:
+        k = len(st.recent)
+        if k < min(max(self.min_periods, 2), self.window):
+            return None
+        var = (st.rsumsq - st.rsum * st.rsum / k) / (k - 1)
+        return math.sqrt(var) if var > 0 else None
+
+    def _push(self, st: _ColumnState, x: float) -> None:
+        if st.n == 0:
+            st.ewma = x
+        else:
+            # Incremental exponentially weighted mean/variance (adjust=False).
+            diff = x - st.ewma
+            incr = self.alpha * diff
+            st.ewma += incr
+            st.ewvar = (1 - self.alpha) * (st.ewvar + diff * incr)
+        st.n += 1
+
+        st.recent.append(x)
+        st.rsum += x
+        st.rsumsq += x * x
+        if len(st.recent) > st.window:
+            old = st.recent.popleft()
+            st.rsum -= old
+            st.rsumsq -= old * old
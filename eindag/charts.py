@@ -10,6 +10,7 @@ import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 
+from .analytics import sum_by_bucket, value_distribution
 from .constants import DEFAULT_FISH_PER_ICON
 
 
@@ -84,9 +85,9 @@ class FishBarChart(ChartFactory):
             ax.text(0.5, 0.5, "Pick a category and numeric column", ha="center", va="center")
             return fig
 
-        grouped = self.df.groupby(cat)[y_col].sum(numeric_only=True).sort_values(ascending=False).head(12)
-        labels = list(map(str, grouped.index))
-        vals = grouped.values.astype(float)
+        grouped = sum_by_bucket(self.df[cat], self.df[y_col], max_buckets=12)
+        labels = [row["category"] for row in grouped]
+        vals = np.array([row["sum"] for row in grouped], dtype=float)
 
         ax.bar(labels, vals)
         ax.tick_params(axis='x', rotation=45)
@@ -115,9 +116,9 @@ class FishPieChart(ChartFactory):
             ax.text(0.5, 0.5, "Pick a category column", ha="center", va="center")
             return fig
 
-        counts = self.df[cat].astype(str).value_counts().head(8)
-        labels = counts.index.tolist()
-        values = counts.values.astype(float)
+        counts = value_distribution(self.df[cat], max_buckets=8)
+        labels = [row["category"] for row in counts]
+        values = np.array([row["count"] for row in counts], dtype=float)
 
         ax.pie(values, labels=labels, startangle=90)
         ax.axis("equal")
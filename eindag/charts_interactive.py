@@ -1,11 +1,14 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional
+from typing import List, Optional
 
 import altair as alt
 import pandas as pd
 
+from .analytics import downsample_by_facet, sum_by_bucket, value_distribution
+from .constants import SMALL_MULTIPLES_POINT_BUDGET
+
 
 @dataclass
 class ChartSpec:
@@ -15,7 +18,7 @@ class ChartSpec:
     category_col: Optional[str] = None
 
 
-def line_chart(df: pd.DataFrame, spec: ChartSpec) -> alt.Chart:
+def line_chart(df: pd.DataFrame, spec: ChartSpec, anomalies: Optional[pd.DataFrame] = None) -> alt.Chart:
     x = spec.x_col
     y = spec.y_col
     if not x or not y:
@@ -35,7 +38,19 @@ def line_chart(df: pd.DataFrame, spec: ChartSpec) -> alt.Chart:
         tooltip=[alt.Tooltip(x, title=x), alt.Tooltip(y, title=y)],
     )
 
-    return (line + points).interactive()
+    layers = line + points
+
+    # Optional overlay: rows flagged by eindag.anomaly, drawn as red markers.
+    if anomalies is not None and len(anomalies):
+        # x and y may be the same column; select it only once.
+        flagged = alt.Chart(anomalies[list(dict.fromkeys([x, y]))]).mark_point(color="red", filled=True, size=60).encode(
+            x=x,
+            y=y,
+            tooltip=[alt.Tooltip(x, title=x), alt.Tooltip(y, title=f"{y} (anomaly)")],
+        )
+        layers = layers + flagged
+
+    return layers.interactive()
 
 
 def pie_chart_counts(df: pd.DataFrame, spec: ChartSpec) -> alt.Chart:
@@ -43,7 +58,7 @@ def pie_chart_counts(df: pd.DataFrame, spec: ChartSpec) -> alt.Chart:
     if not cat:
         return alt.Chart(pd.DataFrame({"msg": ["Pick a category column"]})).mark_text().encode(text="msg")
 
-    counts = df[cat].astype(str).value_counts().reset_index()
+    counts = pd.DataFrame(value_distribution(df[cat], max_buckets=8), columns=["category", "count"])
     counts.columns = [cat, "count"]
 
     chart = alt.Chart(counts).properties(title=spec.title).mark_arc().encode(
@@ -61,11 +76,8 @@ def bar_chart_sum_by_category(df: pd.DataFrame, spec: ChartSpec) -> alt.Chart:
     if not cat or not y:
         return alt.Chart(pd.DataFrame({"msg": ["Pick a category and numeric column"]})).mark_text().encode(text="msg")
 
-    tmp = df.copy()
-    tmp[cat] = tmp[cat].astype(str)
-
-    agg = tmp.groupby(cat, as_index=False)[y].sum()
-    agg = agg.sort_values(y, ascending=False).head(12)
+    agg = pd.DataFrame(sum_by_bucket(df[cat], df[y], max_buckets=12), columns=["category", "sum"])
+    agg.columns = [cat, y]
 
     chart = alt.Chart(agg).properties(title=spec.title).mark_bar().encode(
         x=alt.X(f"{cat}:N", sort="-y", title=cat),
@@ -74,3 +86,57 @@ def bar_chart_sum_by_category(df: pd.DataFrame, spec: ChartSpec) -> alt.Chart:
     )
 
     return chart
+
+
+def small_multiples(
+    df: pd.DataFrame,
+    spec: ChartSpec,
+    metrics: List[str],
+    facet_cols: Optional[List[str]] = None,
+    point_budget: int = SMALL_MULTIPLES_POINT_BUDGET,
+    columns: int = 6,
+) -> alt.Chart:
+    """One small line chart per tank (or site/tank), one row of panels per metric.
+
+    ``spec.x_col`` is the time column and ``spec.category_col`` the default
+    facet. Series are pre-aggregated by ``downsample_by_facet`` so the chart
+    carries at most ``point_budget`` points however many facets there are.
+    """
+    facet_cols = facet_cols or ([spec.category_col] if spec.category_col else [])
+    if not facet_cols or not metrics:
+        return alt.Chart(pd.DataFrame({"msg": ["Pick metrics and a facet column"]})).mark_text().encode(text="msg")
+
+    data = downsample_by_facet(df, facet_cols, spec.x_col, metrics, point_budget=point_budget)
+    total, shown = data.attrs.get("facets_total", 0), data.attrs.get("facets_shown", 0)
+    if data.empty:
+        if total and not shown:
+            msg = f"Too many metrics for {point_budget} points; pick fewer"
+        elif spec.x_col:
+            msg = f"No rows with a usable time in '{spec.x_col}'"
+        else:
+            msg = "No rows to plot"
+        return alt.Chart(pd.DataFrame({"msg": [msg]})).mark_text().encode(text="msg")
+    title = spec.title
+    if shown < total:
+        title = f"{title} (largest {shown} of {total} facets)"
+    x_type = "T" if pd.api.types.is_datetime64_any_dtype(data["time"]) else "Q"
+    x_title = spec.x_col or "row"
+
+    panels = []
+    for m in metrics:
+        panel = alt.Chart(data[data["metric"] == m]).mark_line().encode(
+            x=alt.X(f"time:{x_type}", title=None, axis=alt.Axis(labelAngle=-45, tickCount=3)),
+            y=alt.Y("value:Q", title=m, scale=alt.Scale(zero=False)),
+            tooltip=[
+                alt.Tooltip("facet:N", title=" / ".join(facet_cols)),
+                alt.Tooltip(f"time:{x_type}", title=x_title),
+                alt.Tooltip("value:Q", title=m, format=".2f"),
+            ],
+        ).properties(width=140, height=90).facet(
+            facet=alt.Facet("facet:N", title=None),
+            columns=columns,
+            title=m,
+        )
+        panels.append(panel)
+
+    return alt.vconcat(*panels).properties(title=title)
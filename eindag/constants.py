@@ -21,3 +21,40 @@ DEMO_USERS = {
 # Where uploaded and generated files are stored (relative to repo root)
 UPLOAD_DIR = "data/uploads"
 OUTPUT_DIR = "data/outputs"
+
+# Ingestion endpoint: pushed batches are appended to this file in UPLOAD_DIR,
+# and the latest batch summary is written to OUTPUT_DIR.
+INGEST_STORE_NAME = "ingest_readings.csv"
+INGEST_SUMMARY_NAME = "ingest_last_batch_summary.json"
+
+# Uploads read through pyarrow keep text columns with at most this many distinct
+# values (per read block) as pandas categoricals: tank, site, species.
+CATEGORY_MAX_CARDINALITY = 1000
+
+# Physically plausible sensor ranges (min, max) used by ingest-time validation.
+# None means unbounded on that side.
+SENSOR_RANGES = {
+    "temperature_c": (-2.0, 40.0),
+    "dissolved_oxygen_mg_l": (0.0, 25.0),
+    "ph": (0.0, 14.0),
+    "ammonia_mg_l": (0.0, 10.0),
+    "feed_kg": (0.0, None),
+    "health_score": (0.0, 100.0),
+    "estimated_fish_count": (0.0, None),
+}
+
+# Raw-row exports are streamed this many CSV rows at a time, which bounds
+# their memory use regardless of how large the exported slice is.
+EXPORT_CHUNK_ROWS = 200_000
+EXPORT_FORMATS = ("csv.gz", "parquet")
+# The app writes exports under Streamlit's static folder (next to app.py, with
+# server.enableStaticServing on) so downloads are served straight from disk.
+EXPORT_STATIC_DIR = "static/exports"
+# Static files are public, so exports are deleted after this long.
+EXPORT_MAX_AGE_SECONDS = 60 * 60
+# Streamlit answers 404 for static files larger than this (MAX_APP_STATIC_FILE_SIZE).
+STATIC_MAX_BYTES = 200 * 1024 * 1024
+
+# Total points drawn by the per-tank small-multiples view, split evenly across
+# panels. Kept under Altair's default 5,000-row limit per embedded dataset.
+SMALL_MULTIPLES_POINT_BUDGET = 4000
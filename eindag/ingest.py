@@ -0,0 +1,456 @@
+"""Local asyncio HTTP endpoint for pushed sensor batches.
+
+Gateways POST CSV or JSON-lines batches of tank readings to ``/ingest``.
+Small pushes are parsed straight away, queued and coalesced into larger
+write batches that are appended to the upload store. At most ``max_queue``
+request bodies are held in memory at once: further requests wait before
+their body is read. Each written batch is summarized with the dashboard's
+``compute_basic_metrics`` (last batch only, not the whole store).
+
+Run it with ``python -m eindag.ingest --port 8765``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from .analytics import compute_basic_metrics
+from .anomaly import StreamingAnomalyDetector, sensor_columns
+from .constants import INGEST_STORE_NAME, INGEST_SUMMARY_NAME, SENSOR_RANGES, UPLOAD_DIR
+from .io_utils import append_csv, write_json
+
+logger = logging.getLogger(__name__)
+
+CSV_TYPES = ("text/csv", "application/csv")
+JSONL_TYPES = ("application/x-ndjson", "application/jsonl", "application/json")
+
+REASONS = {
+    200: "OK",
+    202: "Accepted",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Payload Too Large",
+    415: "Unsupported Media Type",
+}
+
+
+class IngestError(Exception):
+    """A request that should be answered with an HTTP error status."""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+@dataclass
+class IngestConfig:
+    repo_root: str
+    host: str = "127.0.0.1"
+    port: int = 8765
+    # Request bodies held in memory (being read, queued or being written);
+    # when all slots are taken, new bodies are not read until one frees up.
+    max_queue: int = 64
+    # Coalesce pushes until this many rows are pending or flush_interval passes.
+    batch_rows: int = 5000
+    flush_interval: float = 0.5
+    max_body_bytes: int = 32 * 1024 * 1024
+    store_name: str = INGEST_STORE_NAME
+    summary_name: str = INGEST_SUMMARY_NAME
+
+
+@dataclass
+class IngestStats:
+    pushes: int = 0
+    rows_accepted: int = 0
+    rows_written: int = 0
+    batches_written: int = 0
+    errors: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "pushes": self.pushes,
+            "rows_accepted": self.rows_accepted,
+            "rows_written": self.rows_written,
+            "batches_written": self.batches_written,
+            "errors": self.errors[-10:],
+        }
+
+
+def parse_batch(body: bytes, content_type: str) -> pd.DataFrame:
+    """Parse a pushed CSV or JSON-lines body into a DataFrame.
+
+    Values are kept as sent (timestamps are not reformatted); the known
+    sensor columns must be numeric, otherwise the push is rejected with 400.
+    """
+    media = content_type.split(";", 1)[0].strip().lower()
+    if not body.strip():
+        return pd.DataFrame()
+    try:
+        if media in CSV_TYPES:
+            df = pd.read_csv(io.BytesIO(body))
+        elif media in JSONL_TYPES:
+            df = pd.read_json(io.BytesIO(body), lines=True, convert_dates=False, dtype=False)
+        else:
+            df = None
+    except Exception as exc:
+        raise IngestError(400, f"Could not parse body: {exc}") from exc
+    if df is None:
+        raise IngestError(415, f"Unsupported content type: {media or '(none)'}")
+    return _coerce_sensors(df)
+
+
+def _coerce_sensors(df: pd.DataFrame) -> pd.DataFrame:
+    """Make the SENSOR_RANGES columns numeric; text that isn't a number is a 400."""
+    for c in SENSOR_RANGES:
+        if c not in df.columns or pd.api.types.is_numeric_dtype(df[c]):
+            continue
+        num = pd.to_numeric(df[c], errors="coerce")
+        # Missing and blank values stay missing; anything else must parse.
+        bad = num.isna() & df[c].notna() & (df[c].astype(str).str.strip() != "")
+        if bad.any():
+            row = int(bad.to_numpy().argmax())
+            raise IngestError(400, f"Non-numeric value {df[c].iloc[row]!r} in column {c!r} (row {row})")
+        df[c] = num
+    return df
+
+
+class IngestServer:
+    """Accepts pushed batches over HTTP/1.1 and writes them in coalesced chunks."""
+
+    def __init__(self, config: IngestConfig) -> None:
+        self.config = config
+        self.stats = IngestStats()
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._columns: Optional[List[str]] = None
+        self._detector: Optional[StreamingAnomalyDetector] = None
+        # Connection handlers, and those in the middle of a request.
+        self._conns: Set[asyncio.Task] = set()
+        self._busy: Set[asyncio.Task] = set()
+        self._closing = False
+
+    @property
+    def port(self) -> int:
+        """The bound port (useful when configured with port=0)."""
+        if self._server is None or not self._server.sockets:
+            return self.config.port
+        return int(self._server.sockets[0].getsockname()[1])
+
+    async def start(self) -> None:
+        # One extra queue slot so stop() can always enqueue its sentinel.
+        self._queue = asyncio.Queue(maxsize=self.config.max_queue + 1)
+        self._slots = asyncio.Semaphore(self.config.max_queue)
+        self._columns = self._existing_columns()
+        self._writer_task = asyncio.create_task(self._writer_loop())
+        self._server = await asyncio.start_server(self._handle_conn, self.config.host, self.config.port)
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self) -> None:
+        """Stop accepting connections, finish requests in flight, then flush the queue."""
+        self._closing = True
+        if self._server is not None:
+            self._server.close()
+            # Idle keep-alive connections are dropped; requests being handled
+            # are answered first, so nothing is queued after the sentinel.
+            for task in self._conns - self._busy:
+                task.cancel()
+            if self._conns:
+                await asyncio.gather(*self._conns, return_exceptions=True)
+            await self._server.wait_closed()
+        if self._queue is not None and self._writer_task is not None:
+            await self._queue.put(None)
+            await self._writer_task
+
+    # HTTP handling
+
+    async def _handle_conn(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._conns.add(task)
+        try:
+            keep_alive = True
+            while keep_alive and not self._closing:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                self._busy.add(task)
+                method, path, headers = _parse_head(head)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                slot = False
+                queued = False
+                try:
+                    length = self._content_length(headers)
+                    if length > 0:
+                        # Backpressure: wait for a free slot before reading the
+                        # body, so memory is bounded by max_queue bodies however
+                        # many clients are connected.
+                        await self._slots.acquire()
+                        slot = True
+                    body = await reader.readexactly(length) if length > 0 else b""
+                    status, payload, queued = await self._dispatch(method, path, headers, body)
+                except IngestError as exc:
+                    status, payload = exc.status, {"error": exc.message}
+                    if exc.status in (411, 413):
+                        keep_alive = False
+                except asyncio.IncompleteReadError:
+                    break
+                finally:
+                    # A queued frame keeps its slot until the writer has flushed it.
+                    if slot and not queued:
+                        self._slots.release()
+                keep_alive = keep_alive and not self._closing
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                self._busy.discard(task)
+        except ConnectionError:
+            pass
+        finally:
+            self._busy.discard(task)
+            self._conns.discard(task)
+            writer.close()
+
+    def _content_length(self, headers: Dict[str, str]) -> int:
+        if "transfer-encoding" in headers:
+            raise IngestError(411, "Chunked bodies are not supported; send Content-Length.")
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            raise IngestError(400, "Invalid Content-Length.")
+        if length > self.config.max_body_bytes:
+            raise IngestError(413, f"Body larger than {self.config.max_body_bytes} bytes.")
+        return max(length, 0)
+
+    async def _dispatch(self, method: str, path: str, headers: Dict[str, str], body: bytes) -> Tuple[int, Dict[str, Any], bool]:
+        """Handle one request; the flag says whether a frame was queued."""
+        path = path.split("?", 1)[0]
+        if path == "/health":
+            if method != "GET":
+                raise IngestError(405, "Use GET.")
+            return 200, {"queued": self._queue.qsize(), **self.stats.to_dict()}, False
+        if path != "/ingest":
+            raise IngestError(404, f"No route for {path}")
+        if method != "POST":
+            raise IngestError(405, "Use POST.")
+
+        df = parse_batch(body, headers.get("content-type", ""))
+        queued = False
+        if len(df):
+            df = self._match_columns(df)
+            await self._queue.put(df)
+            queued = True
+        self.stats.pushes += 1
+        self.stats.rows_accepted += int(len(df))
+        return 202, {"accepted": int(len(df))}, queued
+
+    def _match_columns(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Reject pushes whose columns differ from the store's; reorder the rest."""
+        df.columns = [str(c) for c in df.columns]
+        if self._columns is None:
+            # The first push defines the store's columns.
+            self._columns = list(df.columns)
+            return df
+        missing = [c for c in self._columns if c not in df.columns]
+        extra = [c for c in df.columns if c not in self._columns]
+        if missing or extra:
+            raise IngestError(400, f"Columns do not match the store: missing {missing}, unexpected {extra}")
+        return df[self._columns]
+
+    # Coalescing writer
+
+    async def _writer_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        # Frames whose append failed. They keep their slots (so clients are
+        # slowed down rather than data piling up) and are retried on their own.
+        pending: List[pd.DataFrame] = []
+        stopping = False
+        while not stopping:
+            if pending:
+                await asyncio.sleep(self.config.flush_interval)
+                frames = pending
+            else:
+                first = await self._queue.get()
+                if first is None:
+                    break
+                frames = [first]
+                rows = len(first)
+                deadline = loop.time() + self.config.flush_interval
+                while rows < self.config.batch_rows:
+                    try:
+                        nxt = self._queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        timeout = deadline - loop.time()
+                        if timeout <= 0:
+                            break
+                        try:
+                            nxt = await asyncio.wait_for(self._queue.get(), timeout)
+                        except asyncio.TimeoutError:
+                            break
+                    if nxt is None:
+                        stopping = True
+                        break
+                    frames.append(nxt)
+                    rows += len(nxt)
+            # File writes and summaries run off the event loop so pushes keep flowing.
+            written = await loop.run_in_executor(None, self._flush, frames)
+            if not written and self._closing:
+                # Shutting down: keep the rows next to the store rather than lose them.
+                written = await loop.run_in_executor(None, self._spill, frames)
+            if written or self._closing:
+                pending = []
+                for _ in frames:
+                    self._slots.release()
+            else:
+                pending = frames
+
+    def _flush(self, frames: List[pd.DataFrame]) -> bool:
+        """Append ``frames`` to the store; False (and logged) if that failed."""
+        # Frames were checked against the store's columns in _match_columns.
+        batch = pd.concat(frames, ignore_index=True)
+        try:
+            append_csv(self.config.repo_root, self.config.store_name, batch)
+        except Exception as exc:
+            self.stats.errors.append(f"write failed, will retry {len(batch)} row(s): {type(exc).__name__}: {exc}")
+            logger.exception("Writing %d ingested row(s) to %s failed; will retry", len(batch), self.config.store_name)
+            return False
+        self.stats.rows_written += int(len(batch))
+        self.stats.batches_written += 1
+
+        try:
+
+            # Pushed readings arrive in time order, so the streaming detector
+            # scores them incrementally instead of rescoring the whole store.
+            if self._detector is None:
+                self._detector = StreamingAnomalyDetector(sensor_columns(batch))
+            flags = self._detector.score_frame(batch)
+
+            summary = {
+                "last_batch": compute_basic_metrics(batch),
+                "last_batch_anomalies": {c[: -len("_anomaly")]: int(flags[c].sum()) for c in flags.columns},
+                "ingest": self.stats.to_dict(),
+            }
+            write_json(self.config.repo_root, self.config.summary_name, summary)
+        except Exception as exc:
+            # The rows are already in the store; only the summary is stale.
+            self.stats.errors.append(f"summary failed: {type(exc).__name__}: {exc}")
+            logger.exception("Summarizing an ingested batch failed")
+        return True
+
+    def _spill(self, frames: List[pd.DataFrame]) -> bool:
+        """Write frames that could not be appended to a separate file."""
+        name = f"{self.config.store_name}.unwritten-{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.csv"
+        rows = sum(len(f) for f in frames)
+        try:
+            append_csv(self.config.repo_root, name, pd.concat(frames, ignore_index=True))
+        except Exception:
+            logger.exception("Could not write %d ingested row(s) anywhere; they are lost", rows)
+            return False
+        logger.error("Wrote %d ingested row(s) that could not be appended to %s to %s", rows, self.config.store_name, name)
+        return True
+
+    def _existing_columns(self) -> Optional[List[str]]:
+        abs_path = os.path.join(self.config.repo_root, UPLOAD_DIR, self.config.store_name)
+        if not os.path.exists(abs_path) or os.path.getsize(abs_path) == 0:
+            return None
+        return [str(c) for c in pd.read_csv(abs_path, nrows=0).columns]
+
+
+def _parse_head(head: bytes) -> Tuple[str, str, Dict[str, str]]:
+    lines = head.decode("latin-1").split("\r\n")
+    parts = lines[0].split(" ")
+    method = parts[0].upper() if parts else ""
+    path = parts[1] if len(parts) > 1 else "/"
+    headers: Dict[str, str] = {}
+    for line in lines[1:]:
+        if ":" in line:
+            k, v = line.split(":", 1)
+            headers[k.strip().lower()] = v.strip()
+    return method, path, headers
+
+
+def _response(status: int, payload: Dict[str, Any], keep_alive: bool) -> bytes:
+    body = json.dumps(payload, default=str).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status} {REASONS.get(status, 'Error')}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
+
+
+async def push_batch(host: str, port: int, body: bytes, content_type: str = "text/csv") -> Tuple[int, Dict[str, Any]]:
+    """Minimal local client: POST one batch and return (status, JSON payload)."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        head = (
+            "POST /ingest HTTP/1.1\r\n"
+            f"Host: {host}:{port}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+        raw = await reader.read()
+    finally:
+        writer.close()
+    head_bytes, _, resp_body = raw.partition(b"\r\n\r\n")
+    status = int(head_bytes.split(b" ", 2)[1])
+    return status, json.loads(resp_body or b"{}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the EinDag ingestion endpoint.")
+    parser.add_argument("--repo-root", type=str, default=".")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--batch-rows", type=int, default=5000)
+    parser.add_argument("--max-queue", type=int, default=64)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    config = IngestConfig(
+        repo_root=args.repo_root,
+        host=args.host,
+        port=args.port,
+        batch_rows=args.batch_rows,
+        max_queue=args.max_queue,
+    )
+    server = IngestServer(config)
+
+    async def run() -> None:
+        await server.start()
+        print(f"Listening on http://{config.host}:{server.port}/ingest")
+        try:
+            await server.serve_forever()
+        finally:
+            await server.stop()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
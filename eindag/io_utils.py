@@ -3,21 +3,24 @@
 Rubric:
 - Must read input from a file and produce an output file.
 
-This module saves uploaded CSVs and writes summary outputs (JSON/CSV).
+This module saves uploaded CSVs and writes summary outputs (JSON/CSV), and
+exports filtered slices of an upload to compressed files chunk by chunk.
 """
 
 from __future__ import annotations
 
 import csv
+import gzip
 import json
 import os
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 
+import numpy as np
 import pandas as pd
 
-from .constants import OUTPUT_DIR, UPLOAD_DIR
+from .constants import CATEGORY_MAX_CARDINALITY, EXPORT_CHUNK_ROWS, EXPORT_FORMATS, OUTPUT_DIR, UPLOAD_DIR
 
 
 def ensure_dirs(repo_root: str) -> None:
@@ -40,6 +43,10 @@ def save_upload(repo_root: str, filename: str, bytes_data: bytes) -> str:
 def read_csv_any(repo_root: str, rel_path: str) -> pd.DataFrame:
     """Read a CSV regardless of delimiter quirks."""
     abs_path = os.path.join(repo_root, rel_path)
+    try:
+        return _read_csv_arrow(abs_path)
+    except Exception:
+        pass
     # pandas handles most; if it fails, try python csv sniffer
     try:
         return pd.read_csv(abs_path)
@@ -51,6 +58,23 @@ def read_csv_any(repo_root: str, rel_path: str) -> pd.DataFrame:
             return pd.read_csv(f, sep=dialect.delimiter)
 
 
+def _read_csv_arrow(abs_path: str) -> pd.DataFrame:
+    """Multithreaded read via pyarrow (a streamlit dependency).
+
+    ISO timestamps come back as datetimes and low-cardinality text as
+    categoricals, so validation and charts don't have to parse or hash them
+    again. Raises if pyarrow is missing or can't handle the file.
+    """
+    from pyarrow import csv as pa_csv
+
+    opts = pa_csv.ConvertOptions(
+        strings_can_be_null=True,
+        auto_dict_encode=True,
+        auto_dict_max_cardinality=CATEGORY_MAX_CARDINALITY,
+    )
+    return pa_csv.read_csv(abs_path, convert_options=opts).to_pandas()
+
+
 def write_json(repo_root: str, name: str, payload: Dict[str, Any]) -> str:
     ensure_dirs(repo_root)
     rel_path = os.path.join(OUTPUT_DIR, name)
@@ -74,3 +98,204 @@ def write_csv(repo_root: str, name: str, rows: List[Dict[str, Any]]) -> str:
         writer.writeheader()
         writer.writerows(rows)
     return rel_path
+
+
+def append_csv(repo_root: str, name: str, df: pd.DataFrame) -> str:
+    """Append rows to a CSV in data/uploads, writing the header only once."""
+    ensure_dirs(repo_root)
+    rel_path = os.path.join(UPLOAD_DIR, name)
+    abs_path = os.path.join(repo_root, rel_path)
+    write_header = not os.path.exists(abs_path) or os.path.getsize(abs_path) == 0
+    df.to_csv(abs_path, mode="a", header=write_header, index=False)
+    return rel_path
+
+
+def _csv_sep(abs_path: str) -> str:
+    """Delimiter for a CSV, using the same fallback as read_csv_any."""
+    try:
+        pd.read_csv(abs_path, nrows=50)
+        return ","
+    except Exception:
+        with open(abs_path, "r", newline="", encoding="utf-8") as f:
+            return csv.Sniffer().sniff(f.read(2048)).delimiter
+
+
+def tank_keys(series: pd.Series) -> pd.Series:
+    """Tank ids as comparable text, whatever dtype they were read with.
+
+    Numbers are normalized, so 1, 1.0 and "1" all become "1"; anything
+    else is kept as its text.
+    """
+    text = series.astype(str)
+    num = pd.to_numeric(text, errors="coerce")
+    out = text.mask(num.notna(), num.astype(str))
+    whole = np.isfinite(num) & (num == np.round(num))
+    if whole.any():
+        out[whole] = num[whole].astype(np.int64).astype(str)
+    return out
+
+
+def _naive_utc(value: Any) -> pd.Timestamp:
+    """A time bound as a tz-naive UTC timestamp (naive input is taken as UTC)."""
+    ts = pd.Timestamp(value)
+    return ts.tz_convert("UTC").tz_localize(None) if ts.tzinfo is not None else ts
+
+
+def iter_filtered_chunks(
+    abs_path: str,
+    columns: Optional[Sequence[str]] = None,
+    tanks: Optional[Sequence[str]] = None,
+    start: Optional[Any] = None,
+    end: Optional[Any] = None,
+    tank_col: str = "tank_id",
+    time_col: str = "timestamp",
+    chunk_rows: int = EXPORT_CHUNK_ROWS,
+) -> Iterator[pd.DataFrame]:
+    """Yield the rows of a CSV that match the filters, one chunk at a time.
+
+    ``start``/``end`` bound ``time_col`` (inclusive), compared in UTC like
+    ingest validation does; rows whose time is missing or unparseable are
+    only dropped when a bound is given. ``tanks`` restricts ``tank_col``
+    (matched via ``tank_keys``). Only ``columns`` are kept in the output
+    (default: all).
+    """
+    sep = _csv_sep(abs_path)
+    sample = pd.read_csv(abs_path, nrows=1000, sep=sep)
+    header = [str(c) for c in sample.columns]
+    keep = [c for c in header if columns is None or c in set(columns)]
+    need = set(keep)
+    if tanks is not None:
+        need.add(tank_col)
+    if start is not None or end is not None:
+        need.add(time_col)
+    usecols = [c for c in header if c in need]
+
+    lo = _naive_utc(start) if start is not None else None
+    hi = _naive_utc(end) if end is not None else None
+    tank_set = set(tank_keys(pd.Series(list(tanks), dtype=object))) if tanks is not None else None
+
+    # Pin text columns (and columns still empty in the sample) to str so every
+    # chunk has the same types, even one where a column is entirely empty.
+    # The tank column is always read as text; tank_keys normalizes it.
+    text_cols = {c: str for c in usecols if not pd.api.types.is_numeric_dtype(sample[c]) or sample[c].isna().all()}
+    if tank_set is not None:
+        text_cols[tank_col] = str
+    reader = pd.read_csv(abs_path, sep=sep, usecols=usecols, dtype=text_cols, chunksize=chunk_rows)
+    for chunk in reader:
+        mask = pd.Series(True, index=chunk.index)
+        if tank_set is not None:
+            mask &= tank_keys(chunk[tank_col]).isin(tank_set)
+        if lo is not None or hi is not None:
+            # Zoned and naive timestamps both end up as naive UTC.
+            ts = pd.to_datetime(chunk[time_col], errors="coerce", utc=True).dt.tz_localize(None)
+            if lo is not None:
+                mask &= ts >= lo
+            if hi is not None:
+                mask &= ts <= hi
+        out = chunk.loc[mask, keep]
+        if len(out):
+            yield out
+
+
+def export_rows(
+    repo_root: str,
+    src_rel_path: str,
+    name: str,
+    fmt: str = "csv.gz",
+    columns: Optional[Sequence[str]] = None,
+    tanks: Optional[Sequence[str]] = None,
+    start: Optional[Any] = None,
+    end: Optional[Any] = None,
+    chunk_rows: int = EXPORT_CHUNK_ROWS,
+    out_dir: str = OUTPUT_DIR,
+) -> Tuple[str, int]:
+    """Stream a filtered slice of an upload to ``out_dir`` (data/outputs).
+
+    Rows are read, filtered and written ``chunk_rows`` at a time, so memory
+    stays bounded by the chunk size rather than the size of the slice.
+    ``fmt`` is "csv.gz" or "parquet" (Parquet needs pyarrow). Returns the
+    relative output path and the number of rows written.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {sorted(EXPORT_FORMATS)}")
+    ensure_dirs(repo_root)
+    Path(repo_root, out_dir).mkdir(parents=True, exist_ok=True)
+    rel_path = os.path.join(out_dir, name if name.endswith(f".{fmt}") else f"{name}.{fmt}")
+    abs_path = os.path.join(repo_root, rel_path)
+    chunks = iter_filtered_chunks(
+        os.path.join(repo_root, src_rel_path),
+        columns=columns,
+        tanks=tanks,
+        start=start,
+        end=end,
+        chunk_rows=chunk_rows,
+    )
+    try:
+        if fmt == "parquet":
+            n_rows = _write_parquet_chunks(abs_path, chunks)
+        else:
+            n_rows = _write_csv_gz_chunks(abs_path, chunks)
+    except BaseException:
+        # Don't leave a truncated file behind.
+        if os.path.exists(abs_path):
+            os.remove(abs_path)
+        raise
+    return rel_path, n_rows
+
+
+def prune_exports(repo_root: str, out_dir: str, max_age_seconds: float) -> int:
+    """Delete files in ``out_dir`` older than ``max_age_seconds``; returns how many."""
+    folder = Path(repo_root, out_dir)
+    if not folder.is_dir():
+        return 0
+    cutoff = datetime.now().timestamp() - max_age_seconds
+    removed = 0
+    for path in folder.iterdir():
+        try:
+            if path.is_file() and path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def _write_csv_gz_chunks(abs_path: str, chunks: Iterator[pd.DataFrame]) -> int:
+    n_rows = 0
+    # Level 1: exports are large and mostly numeric, so speed beats the last few percent of size.
+    with gzip.open(abs_path, "wt", encoding="utf-8", newline="", compresslevel=1) as f:
+        for chunk in chunks:
+            chunk.to_csv(f, header=n_rows == 0, index=False)
+            n_rows += len(chunk)
+    return n_rows
+
+
+def _write_parquet_chunks(abs_path: str, chunks: Iterator[pd.DataFrame]) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ImportError("Parquet export needs pyarrow (pip install pyarrow).") from exc
+
+    n_rows = 0
+    writer = None
+    try:
+        for chunk in chunks:
+            if writer is None:
+                schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+                # A text column that is empty in the first chunk infers as null; keep it a string.
+                for i, f in enumerate(schema):
+                    if pa.types.is_null(f.type):
+                        schema = schema.set(i, pa.field(f.name, pa.string()))
+                writer = pq.ParquetWriter(abs_path, schema, compression="snappy")
+            # Every chunk follows the first chunk's schema (NaN becomes null).
+            table = pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False)
+            writer.write_table(table)
+            n_rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        # Nothing matched: still leave a valid (empty) file behind.
+        pq.write_table(pa.table({}), abs_path)
+    return n_rows
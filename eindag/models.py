@@ -9,7 +9,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 
 @dataclass
@@ -19,6 +19,24 @@ class User:
     created_at: datetime = field(default_factory=datetime.utcnow)
 
 
+@dataclass
+class QualityIssue:
+    """One data quality check result: how many rows, and where."""
+
+    check: str
+    column: str
+    count: int
+    n_ranges: int = 0
+    row_ranges: List[Tuple[int, int]] = field(default_factory=list)
+    detail: str = ""
+
+    def message(self) -> str:
+        where = ", ".join(f"{a}" if a == b else f"{a}-{b}" for a, b in self.row_ranges)
+        if self.n_ranges > len(self.row_ranges):
+            where += f", ... ({self.n_ranges} ranges)"
+        return f"{self.check} in '{self.column}': {self.count} row(s), {self.detail} (rows {where})"
+
+
 @dataclass
 class CSVDataSet:
     """Represents an uploaded CSV plus a parsed in-memory representation."""
@@ -30,6 +48,7 @@ class CSVDataSet:
     preview_rows: List[Dict[str, Any]] = field(default_factory=list)
     numeric_columns: List[str] = field(default_factory=list)
     errors: List[str] = field(default_factory=list)
+    quality_issues: List[QualityIssue] = field(default_factory=list)
 
     def has_numeric(self) -> bool:
         return len(self.numeric_columns) > 0
@@ -0,0 +1,248 @@
+"""Ingest-time data quality checks.
+
+Every check builds a boolean mask over the rows in one vectorized pass and is
+reported as a ``QualityIssue`` (a count plus a few row ranges) rather than one
+message per row, so it is cheap enough to run on every upload.
+
+Row numbers are 0-based positions in the uploaded file (header excluded).
+"""
+
+from __future__ import annotations
+
+import warnings
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .constants import SENSOR_RANGES
+from .models import QualityIssue
+
+GAP_FACTOR = 3.0
+# A tank's sampling interval is the median of (up to) its first
+# INTERVAL_SAMPLE spacings, but never less than MIN_SAMPLING_INTERVAL, so a
+# burst of near-duplicate readings doesn't turn every pause into a gap.
+INTERVAL_SAMPLE = 2000
+MIN_SAMPLING_INTERVAL = pd.Timedelta(seconds=1)
+NAN_BURST_LEN = 3
+MAX_RANGES = 5
+NAT = np.iinfo(np.int64).min
+
+
+def validate_readings(
+    df: pd.DataFrame,
+    group_col: str = "tank_id",
+    time_col: str = "timestamp",
+    ranges: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+    sampling_interval: Optional[pd.Timedelta] = None,
+    nan_burst_len: int = NAN_BURST_LEN,
+    min_interval: pd.Timedelta = MIN_SAMPLING_INTERVAL,
+) -> List[QualityIssue]:
+    """Run all checks; columns that are not present are simply skipped.
+
+    - duplicate / out-of-order timestamps within a tank
+    - gaps longer than ``GAP_FACTOR`` x the sampling interval: ``sampling_interval``
+      for every tank if given, otherwise each tank's own median spacing
+      (at least ``min_interval``)
+    - bursts of ``nan_burst_len`` or more consecutive missing values per tank
+    - sensor values outside ``ranges`` (defaults to ``SENSOR_RANGES``)
+    """
+    issues: List[QualityIssue] = []
+    if len(df) == 0:
+        return issues
+
+    codes = _group_codes(df, group_col)
+    if np.all(codes[1:] >= codes[:-1]):
+        # One tank, or tanks already in blocks: file order is tank order.
+        order = None
+        same_tank = _same_as_previous(codes)
+    else:
+        # Stable sort by tank keeps each tank's rows in file order.
+        order = np.argsort(codes, kind="stable")
+        same_tank = _same_as_previous(codes[order])
+
+    if time_col in df.columns:
+        t = _take(parse_times_ns(df[time_col]), order)
+        pair = same_tank
+        missing_time = t == NAT
+        if missing_time.any():
+            pair = pair & ~missing_time & ~np.concatenate([[False], missing_time[:-1]])
+        step = _step(t)
+
+        back = pair & (step < 0)
+        issues.append(_issue("out_of_order_timestamp", time_col, back, order, "timestamp earlier than the previous reading for the same tank"))
+
+        if back.any():
+            # Re-sort by (tank, time) so duplicates and gaps are measured on true order.
+            resort = np.lexsort((t, _take(codes, order)))
+            order = resort if order is None else order[resort]
+            t = t[resort]
+            same_tank = _same_as_previous(codes[order])
+            missing_time = t == NAT
+            pair = same_tank & ~missing_time & ~np.concatenate([[False], missing_time[:-1]])
+            step = _step(t)
+
+        dup = pair & (step == 0)
+        issues.append(_issue("duplicate_timestamp", time_col, dup, order, "same timestamp repeated for a tank"))
+
+        if sampling_interval is not None:
+            interval = int(pd.Timedelta(sampling_interval).value)
+            gap = pair & (step > GAP_FACTOR * interval)
+            detail = f"more than {GAP_FACTOR:g} x the {pd.Timedelta(interval, unit='ns')} sampling interval since the previous reading"
+        else:
+            gap = _tank_gaps(step, pair, same_tank, int(pd.Timedelta(min_interval).value))
+            detail = f"more than {GAP_FACTOR:g} x the tank's median spacing since the previous reading"
+        issues.append(_issue("gap", time_col, gap, order, detail))
+
+    numeric_cols = [str(c) for c in df.columns if str(c) != group_col and pd.api.types.is_numeric_dtype(df[c])]
+    arrays = {c: _as_array(df[c]) for c in numeric_cols}
+    extremes: Dict[str, Tuple[float, float]] = {}
+    for c, v in arrays.items():
+        if v.dtype.kind != "f":
+            continue
+        # minimum/maximum propagate NaN, so a clean column is settled (and its
+        # range known) in two passes.
+        lo_v, hi_v = np.minimum.reduce(v), np.maximum.reduce(v)
+        if not np.isnan(lo_v):
+            extremes[c] = (lo_v, hi_v)
+            continue
+        missing = np.isnan(v)
+        if int(missing.sum()) >= nan_burst_len:
+            burst = _long_runs(_take(missing, order), same_tank, nan_burst_len)
+            issues.append(_issue("nan_burst", c, burst, order, f"{nan_burst_len}+ consecutive missing values for a tank"))
+
+    for c, (lo, hi) in (SENSOR_RANGES if ranges is None else ranges).items():
+        if c not in arrays:
+            continue
+        v = arrays[c]
+        if c not in extremes:
+            # Floats only get here when they hold NaN, which fmin/fmax skip.
+            lo_f, hi_f = (np.fmin, np.fmax) if v.dtype.kind == "f" else (np.minimum, np.maximum)
+            extremes[c] = (lo_f.reduce(v), hi_f.reduce(v))
+        too_low = lo is not None and extremes[c][0] < lo
+        too_high = hi is not None and extremes[c][1] > hi
+        if not (too_low or too_high):
+            continue
+        if too_low and too_high:
+            bad = (v < lo) | (v > hi)
+        else:
+            bad = v < lo if too_low else v > hi
+        issues.append(_issue("out_of_range", c, bad, None, f"outside [{_fmt(lo, '-inf')}, {_fmt(hi, 'inf')}]"))
+
+    return [i for i in issues if i.count > 0]
+
+
+def _group_codes(df: pd.DataFrame, group_col: str) -> np.ndarray:
+    if group_col not in df.columns:
+        return np.zeros(len(df), dtype=np.int16)
+    col = df[group_col]
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        # Already factorized; codes are int8/int16 for realistic tank counts.
+        return col.cat.codes.to_numpy()
+    codes, uniques = pd.factorize(col)
+    # Small integer codes let numpy use its radix sort.
+    return codes.astype(np.int16 if len(uniques) < 2**15 else np.int64)
+
+
+def _take(a: np.ndarray, order: Optional[np.ndarray]) -> np.ndarray:
+    return a if order is None else a[order]
+
+
+def _tank_gaps(step: np.ndarray, pair: np.ndarray, same_tank: np.ndarray, floor: int) -> np.ndarray:
+    """Rows (in tank order) whose step exceeds ``GAP_FACTOR`` x their tank's interval.
+
+    A tank's interval is the median of its first ``INTERVAL_SAMPLE`` positive
+    spacings, floored at ``floor``. One slice per tank, so the cost is a
+    pass over the rows plus a little per tank.
+    """
+    gap = np.zeros(len(step), dtype=bool)
+    bounds = np.append(np.flatnonzero(~same_tank), len(step))
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        head = step[start:min(end, start + INTERVAL_SAMPLE + 1)]
+        positive = head[pair[start:start + len(head)] & (head > 0)]
+        if len(positive) == 0:
+            continue
+        interval = max(int(np.median(positive)), floor)
+        np.greater(step[start:end], GAP_FACTOR * interval, out=gap[start:end])
+    return gap & pair
+
+
+def _same_as_previous(sorted_codes: np.ndarray) -> np.ndarray:
+    same = np.zeros(len(sorted_codes), dtype=bool)
+    np.equal(sorted_codes[1:], sorted_codes[:-1], out=same[1:])
+    return same
+
+
+def _step(t: np.ndarray) -> np.ndarray:
+    """Difference to the previous element (0 for the first)."""
+    step = np.zeros(len(t), dtype=np.int64)
+    np.subtract(t[1:], t[:-1], out=step[1:])
+    return step
+
+
+def _as_array(series: pd.Series) -> np.ndarray:
+    if pd.api.types.is_extension_array_dtype(series):
+        return series.to_numpy(dtype="float64", na_value=np.nan)
+    return series.to_numpy()
+
+
+def parse_times_ns(series: pd.Series) -> np.ndarray:
+    """Timestamps as naive-UTC int64 nanoseconds; missing or unparseable values become ``NAT``.
+
+    Any format pandas can infer is accepted and zone-aware values are converted
+    to UTC, so ingest validation and chart downsampling read times the same way.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        if getattr(series.dt, "tz", None) is not None:
+            series = series.dt.tz_convert(None)
+        return series.to_numpy(dtype="datetime64[ns]").view(np.int64)
+    try:
+        # numpy's ISO-8601 parser is much faster than pandas' for clean exports.
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            return series.to_numpy().astype("datetime64[ns]").view(np.int64)
+    except (ValueError, TypeError, OverflowError, Warning):
+        parsed = pd.to_datetime(series, errors="coerce", utc=True)
+        return parsed.dt.tz_localize(None).to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+
+def _long_runs(flag: np.ndarray, same_tank: np.ndarray, min_len: int) -> np.ndarray:
+    """Mark runs of True of at least ``min_len`` that stay within one tank."""
+    out = np.zeros(len(flag), dtype=bool)
+    if not flag.any():
+        return out
+    # A run starts wherever the flag turns on or the tank changes under it.
+    starts_mask = flag & ~(np.concatenate([[False], flag[:-1]]) & same_tank)
+    ends_mask = flag & ~(np.concatenate([flag[1:], [False]]) & np.concatenate([same_tank[1:], [False]]))
+    starts = np.flatnonzero(starts_mask)
+    ends = np.flatnonzero(ends_mask)
+    long = (ends - starts + 1) >= min_len
+    if not long.any():
+        return out
+    delta = np.zeros(len(flag) + 1, dtype=np.int64)
+    np.add.at(delta, starts[long], 1)
+    np.add.at(delta, ends[long] + 1, -1)
+    return np.cumsum(delta[:-1]) > 0
+
+
+def _row_ranges(rows: np.ndarray, limit: int = MAX_RANGES) -> Tuple[int, List[Tuple[int, int]]]:
+    """Number of contiguous runs in sorted flagged ``rows``, and the first ``limit`` of them."""
+    breaks = np.flatnonzero(np.diff(rows) > 1)
+    starts = np.concatenate([[0], breaks + 1])
+    ends = np.concatenate([breaks, [len(rows) - 1]])
+    return len(starts), [(int(rows[s]), int(rows[e])) for s, e in zip(starts[:limit], ends[:limit])]
+
+
+def _issue(check: str, column: str, mask: np.ndarray, order: Optional[np.ndarray], detail: str) -> QualityIssue:
+    """Summarize ``mask``; if it is in tank order, ``order`` maps it back to file rows."""
+    rows = np.flatnonzero(mask)
+    if len(rows) == 0:
+        return QualityIssue(check=check, column=column, count=0)
+    if order is not None:
+        rows = np.sort(order[rows])
+    n_ranges, ranges = _row_ranges(rows)
+    return QualityIssue(check=check, column=column, count=int(len(rows)), n_ranges=n_ranges, row_ranges=ranges, detail=detail)
+
+
+def _fmt(bound: Optional[float], unbounded: str) -> str:
+    return unbounded if bound is None else f"{bound:g}"
@@ -0,0 +1,100 @@
+"""Cold-start benchmark: `import eindag` and first-page render time.
+
+Each sample runs in a fresh interpreter so nothing is cached in-process.
+"eager" imports the submodules the package's `__init__` imported before lazy
+loading (constants, models, auth, io_utils, analytics, charts); modules added
+since then are left out so the baseline isn't inflated. "lazy" is a plain
+`import eindag`.
+
+The page render uses Streamlit's AppTest to run app.py once (the login page)
+and is skipped if streamlit is not installed.
+
+    python scripts/benchmark_import.py --runs 7
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# What eindag/__init__.py imported eagerly before lazy loading.
+EAGER_SUBMODULES = [
+    "constants",
+    "models",
+    "auth",
+    "io_utils",
+    "analytics",
+    "charts",
+]
+
+EAGER = "import eindag; " + "; ".join(f"import eindag.{m}" for m in EAGER_SUBMODULES)
+LAZY = "import eindag"
+
+IMPORT_SNIPPET = """
+import time
+t0 = time.perf_counter()
+{imports}
+print(time.perf_counter() - t0)
+"""
+
+RENDER_SNIPPET = """
+import time
+t0 = time.perf_counter()
+{imports}
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=60)
+at.run()
+assert not at.exception, at.exception
+print(time.perf_counter() - t0)
+"""
+
+
+def _sample(code: str) -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=str(REPO_ROOT),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def _median_ms(code: str, runs: int) -> float:
+    return statistics.median(_sample(code) for _ in range(runs)) * 1000.0
+
+
+def _has_streamlit() -> bool:
+    return subprocess.run([sys.executable, "-c", "import streamlit"], capture_output=True).returncode == 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = []
+    for label, imports in (("eager (before)", EAGER), ("lazy (after)", LAZY)):
+        rows.append((f"import eindag, {label}", _median_ms(IMPORT_SNIPPET.format(imports=imports), args.runs)))
+
+    if _has_streamlit():
+        app = str(REPO_ROOT / "app.py")
+        for label, imports in (("eager (before)", EAGER), ("lazy (after)", LAZY)):
+            code = RENDER_SNIPPET.format(imports=imports, app=app)
+            rows.append((f"first page render, {label}", _median_ms(code, args.runs)))
+    else:
+        print("streamlit not installed; skipping first-page render timing")
+
+    width = max(len(name) for name, _ in rows)
+    print(f"median of {args.runs} fresh interpreters")
+    for name, ms in rows:
+        print(f"{name:<{width}}  {ms:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
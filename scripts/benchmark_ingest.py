@@ -0,0 +1,83 @@
+"""Ingest-overhead benchmark: what always-on validation adds to an upload.
+
+Writes a synthetic export shaped like `generate_sample_data.py` (30 tanks,
+timestamps as ISO strings) and times the app's upload path: `save_upload`,
+`read_csv_any` and `describe_dataset(validate=False)`. `validate_readings` is
+timed on its own against the same frame, so the overhead is validation time
+over ingest time.
+
+    python scripts/benchmark_ingest.py --rows 3000000 --runs 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from eindag.analytics import describe_dataset  # noqa: E402
+from eindag.io_utils import read_csv_any, save_upload  # noqa: E402
+from eindag.validation import validate_readings  # noqa: E402
+
+
+def synthetic_csv(rows: int, seed: int = 7) -> bytes:
+    """Vectorized stand-in for generate_sample_data (which is too slow at this size)."""
+    rng = np.random.default_rng(seed)
+    ts = pd.Timestamp("2024-01-01") + pd.to_timedelta(np.arange(rows), unit="min")
+    tanks = np.array([f"T{n:03d}" for n in range(1, 31)])
+    df = pd.DataFrame(
+        {
+            "timestamp": ts.strftime("%Y-%m-%dT%H:%M:%S"),
+            "site": rng.choice(["Hoboken Pilot", "Brooklyn Lab", "Jersey Shore Farm"], rows),
+            "tank_id": tanks[rng.integers(0, len(tanks), rows)],
+            "species": rng.choice(["tilapia", "salmon", "shrimp", "catfish"], rows),
+            "temperature_c": rng.normal(20, 6, rows).round(2),
+            "dissolved_oxygen_mg_l": rng.normal(7, 1, rows).round(2),
+            "ph": rng.normal(7.2, 0.15, rows).round(2),
+            "ammonia_mg_l": rng.normal(0.15, 0.05, rows).clip(0).round(3),
+            "feed_kg": rng.normal(1.5, 0.4, rows).clip(0).round(2),
+            "health_score": rng.integers(60, 101, rows),
+            "estimated_fish_count": rng.normal(800, 30, rows).astype(int),
+        }
+    )
+    return df.to_csv(index=False).encode("utf-8")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=3_000_000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    data = synthetic_csv(args.rows)
+    ingest, validate = [], []
+    with tempfile.TemporaryDirectory() as root:
+        for _ in range(args.runs):
+            t0 = time.perf_counter()
+            rel_path = save_upload(root, "bench.csv", data)
+            df = read_csv_any(root, rel_path)
+            describe_dataset(df, "bench.csv", rel_path, validate=False)
+            t1 = time.perf_counter()
+            issues = validate_readings(df)
+            t2 = time.perf_counter()
+            ingest.append(t1 - t0)
+            validate.append(t2 - t1)
+
+    ingest_s, validate_s = statistics.median(ingest), statistics.median(validate)
+    print(f"{args.rows:,} rows, median of {args.runs} runs")
+    print(f"ingest (save + read + describe)  {ingest_s:8.3f} s")
+    print(f"validate_readings                {validate_s:8.3f} s  ({len(issues)} issue(s))")
+    print(f"overhead                         {validate_s / ingest_s:8.1%}")
+
+
+if __name__ == "__main__":
+    main()
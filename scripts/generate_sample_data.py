@@ -22,7 +22,8 @@ def generate(rows: int, seed: int | None = 7) -> pd.DataFrame:
     for i in range(rows):
         ts = start + timedelta(minutes=i)
         site = random.choice(sites)
-        tank = random.choice(tanks)
+        # Tanks report in turn, so each one is sampled on a fixed schedule.
+        tank = tanks[i % len(tanks)]
         sp = random.choice(species)
 
         if sp == "salmon":